@@ -1,10 +1,15 @@
 import requests
 import json
+import os
 from typing import Dict, Any
 
-def fetch_brand_assets(brand_name: str) -> Dict[str, Any]:
+# Shared session so repeat BrandFetch lookups reuse the keep-alive
+# connection to api.brandfetch.io instead of a new TLS handshake each time
+HTTP_SESSION = requests.Session()
+
+def fetch_brand_assets(domain: str) -> Dict[str, Any]:
     """
-    Fetch brand assets from BrandFetch API
+    Fetch brand assets from BrandFetch API for a domain (e.g. "acme.com")
     Includes logo, colors, fonts, and other brand guidelines
     
     Note: Requires BRANDFETCH_API_KEY environment variable
@@ -44,8 +49,8 @@ def fetch_brand_assets(brand_name: str) -> Dict[str, Any]:
             api_key = os.getenv('BRANDFETCH_API_KEY')
             if api_key:
                 headers = {'Authorization': f'Bearer {api_key}'}
-                response = requests.get(
-                    f'https://api.brandfetch.io/v2/brands/{brand_name}',
+                response = HTTP_SESSION.get(
+                    f'https://api.brandfetch.io/v2/brands/{domain}',
                     headers=headers,
                     timeout=10
                 )
@@ -68,6 +73,7 @@ def fetch_brand_assets(brand_name: str) -> Dict[str, Any]:
                         fonts_list = data['fonts']
                         if fonts_list:
                             brand_assets['fonts']['primary'] = fonts_list[0].get('name', 'Inter')
+
         
         except Exception as e:
             print(f"BrandFetch API error: {str(e)}")
@@ -76,5 +82,3 @@ def fetch_brand_assets(brand_name: str) -> Dict[str, Any]:
     
     except Exception as e:
         raise Exception(f"Failed to fetch brand assets: {str(e)}")
-
-import os
@@ -1,15 +1,268 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, FeatureNotFound
 import requests
-from urllib.parse import urljoin
-from collections import Counter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urljoin, urlparse
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import os
+import posixpath
 import re
-from app.content_generator import generate_brand_summary
+import threading
+import time
+from app.content_generator import generate_brand_summary, generate_brand_metadata
+from app.ttl_cache import TTLCache
+
+# Prefer the C-backed lxml parser for page parsing; fall back to the
+# pure-Python html.parser when lxml isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# CSS token patterns, compiled once and shared by the stylesheet fetcher and extractor.
+# Kept as two separate scans: a font-family value runs to the next ; or }, so in one
+# alternation it would swallow any hex colors after an unterminated inline style.
+#   HEX_COLOR_RE   - 6-digit and 3-digit hex colors
+#   FONT_FAMILY_RE - font-family declarations (full, possibly multi-word, font stack)
+HEX_COLOR_RE = re.compile(r'#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})\b')
+FONT_FAMILY_RE = re.compile(r'font-family:\s*([^;}]+)')
+
+# Class names that mark a page's main content containers
+MAIN_SECTION_CLASS_RE = re.compile(r'content|main|body|post', re.I)
+
+# url(...) targets of inline background-image declarations
+BACKGROUND_IMAGE_RE = re.compile(r'background-image:\s*url\(["\']?([^"\'()]+)["\']?\)', re.IGNORECASE)
+
+# URL keywords of pages worth crawling after the homepage
+PRIORITY_PAGE_KEYWORDS = ('about', 'contact', 'services', 'portfolio', 'work', 'blog', 'pricing', 'team')
+
+# Common junk keywords in image filenames or classes
+JUNK_IMAGE_KEYWORDS = ('facebook', 'twitter', 'linkedin', 'instagram', 'pixel', 'analytics',
+                       'icon', 'button', 'user', 'cart', 'search', 'arrow', 'flag', 'placeholder',
+                       'avatar', 'download', 'spinner', 'loading',
+                       # "Marquee" junk - client logos, awards, etc.
+                       'client', 'partner', 'sponsor', 'award', 'badge', 'testimonial', 'review')
+
+# Image URL keywords that suggest a prominent content image (background images use all but 'background')
+HERO_IMAGE_KEYWORDS = ('hero', 'banner', 'main', 'feature', 'cover', 'background')
+HERO_BACKGROUND_KEYWORDS = ('hero', 'banner', 'main', 'feature', 'cover')
+
+# The keyword tuples as alternations, so each image is checked in one regex scan
+# instead of one substring search per keyword
+JUNK_IMAGE_RE = re.compile('|'.join(map(re.escape, JUNK_IMAGE_KEYWORDS)))
+HERO_IMAGE_RE = re.compile('|'.join(map(re.escape, HERO_IMAGE_KEYWORDS)))
+HERO_BACKGROUND_RE = re.compile('|'.join(map(re.escape, HERO_BACKGROUND_KEYWORDS)))
+
+# Logo hints in (lowercased) image URLs, matched in one regex scan per image
+LOGO_HINT_RE = re.compile(r'logo|brand-mark')
+
+# Photo extensions, preferred over PNG/SVG graphics for post content. Matched anywhere in
+# the URL: image CDNs put the file name in the query or mid-path (/_next/image?url=%2Fhero.jpg)
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.webp')
+
+# Linked files that are never HTML pages; candidates with these extensions would only
+# burn one of the crawl's page slots on a request that gets skipped
+NON_HTML_EXTENSIONS = frozenset({
+    '.pdf', '.zip', '.rar', '.gz', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico',
+    '.mp3', '.mp4', '.mov', '.avi', '.webm', '.css', '.js', '.json', '.xml',
+})
+
+# Generic CSS font keywords that never identify a brand font
+GENERIC_FONTS = frozenset({'sans-serif', 'serif', 'monospace', 'inherit', 'initial'})
+
+# Common "boring" neutrals, dropped from the palette when there are enough other colors
+BORING_COLORS = frozenset({'#FFFFFF', '#000000', '#F2F2F2', '#CCCCCC', '#333333'})
+
+# Stylesheet URLs that recently yielded no colors or fonts.
+# Shared across scrapes so known-empty CSS (print.css, resets, analytics) isn't re-fetched;
+# entries expire so a stylesheet that was briefly empty (maintenance page) is retried.
+EMPTY_CSS_CACHE_TTL = int(os.getenv('EMPTY_CSS_CACHE_TTL', 60 * 60))  # seconds
+EMPTY_CSS_CACHE_MAX_ENTRIES = int(os.getenv('EMPTY_CSS_CACHE_MAX_ENTRIES', 10000))
+EMPTY_CSS_CACHE = TTLCache(EMPTY_CSS_CACHE_TTL, EMPTY_CSS_CACHE_MAX_ENTRIES)
+
+# Upper bounds on how much of a page / stylesheet is downloaded and parsed.
+# Bodies are streamed and cut off at the cap so a huge landing page can't blow up memory.
+MAX_PAGE_BYTES = 2 * 1024 * 1024
+MAX_CSS_BYTES = 512 * 1024
+# Responses that declare a Content-Length above these are skipped without reading the
+# body at all - a multi-megabyte "page" is a mislabelled download, not a landing page
+MAX_PAGE_CONTENT_LENGTH = 5 * 1024 * 1024
+MAX_CSS_CONTENT_LENGTH = 2 * 1024 * 1024
+
+# (connect, read) timeouts in seconds. Unreachable hosts fail fast on connect while
+# slow-but-alive pages still get the full read window
+PAGE_FETCH_TIMEOUT = (2, 4)
+CSS_FETCH_TIMEOUT = (2, 2)
+
+# Long-lived worker pools shared by all scrapes, so threads are started once per process
+# instead of per scrape:
+#   PAGE_FETCH_EXECUTOR - follow-up page downloads picked from the homepage
+#   CSS_FETCH_EXECUTOR  - stylesheet downloads (max stylesheets in flight across all scrapes)
+#   BACKGROUND_EXECUTOR - AI summary/metadata calls and color/font extraction
+PAGE_FETCH_WORKERS = int(os.getenv('PAGE_FETCH_WORKERS', 16))
+CSS_FETCH_WORKERS = int(os.getenv('CSS_FETCH_WORKERS', 16))
+BACKGROUND_WORKERS = int(os.getenv('SCRAPE_BACKGROUND_WORKERS', 12))
+PAGE_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=PAGE_FETCH_WORKERS, thread_name_prefix='page-fetch')
+CSS_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=CSS_FETCH_WORKERS, thread_name_prefix='css-fetch')
+BACKGROUND_EXECUTOR = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='scrape-bg')
+
+# Finished scrapes keyed by normalized URL.
+# Repeat analyses of the same site skip the crawl, CSS fetches and AI summary entirely.
+SCRAPE_CACHE_TTL = int(os.getenv('SCRAPE_CACHE_TTL', 24 * 60 * 60))  # seconds
+SCRAPE_CACHE_MAX_ENTRIES = int(os.getenv('SCRAPE_CACHE_MAX_ENTRIES', 256))
+SCRAPE_CACHE = TTLCache(SCRAPE_CACHE_TTL, SCRAPE_CACHE_MAX_ENTRIES)
+
+# Shared HTTP session: pages and stylesheets of a site come from the same few hosts,
+# so reuse keep-alive connections instead of a fresh TCP + TLS handshake per request.
+# Cookies are not persisted between scrapes.
+# With Brotli installed, requests advertises and transparently decodes "br" alongside gzip,
+# which shrinks HTML/CSS on the wire for most CDNs.
+HTTP_SESSION = requests.Session()
+# Browser User-Agent for every page and stylesheet request - some CDNs reject the default python-requests one
+HTTP_SESSION.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+HTTP_SESSION.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+# Throttled (429) and briefly unavailable (5xx) responses are retried with exponential
+# back-off, honoring Retry-After up to RETRY_AFTER_MAX seconds so a scrape never stalls
+# on a long server-requested wait. Connect errors get one retry; slow reads are not retried.
+RETRY_AFTER_MAX = float(os.getenv('SCRAPE_RETRY_AFTER_MAX', 3))
+
+class CappedRetry(Retry):
+    """urllib3 Retry whose Retry-After waits are capped at RETRY_AFTER_MAX"""
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, RETRY_AFTER_MAX)
+
+HTTP_RETRY = CappedRetry(total=3, connect=1, read=0, backoff_factor=0.5,
+                         status_forcelist=(429, 500, 502, 503, 504),
+                         respect_retry_after_header=True, raise_on_status=False)
+HTTP_SESSION.mount('http://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=HTTP_RETRY))
+HTTP_SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=HTTP_RETRY))
+
+# Politeness limit: at most HOST_RATE_LIMIT requests per second to any one host, across
+# all concurrent scrapes (sliding one-second window, 0 disables). Pages and stylesheets
+# are fetched concurrently, so without this a single site can get a burst of requests.
+HOST_RATE_LIMIT = float(os.getenv('SCRAPE_HOST_RATE_LIMIT', 10))
+HOST_REQUEST_TIMES = {}
+HOST_REQUEST_TIMES_LIMIT = 10000
+HOST_RATE_LOCK = threading.Lock()
+
+def wait_for_host_slot(target_url):
+    """Block until a request to the URL's host fits under HOST_RATE_LIMIT"""
+    if HOST_RATE_LIMIT <= 0:
+        return
+    host = urlparse(target_url).netloc.lower()
+    while True:
+        with HOST_RATE_LOCK:
+            now = time.monotonic()
+            times = HOST_REQUEST_TIMES.get(host)
+            if times is None:
+                if len(HOST_REQUEST_TIMES) >= HOST_REQUEST_TIMES_LIMIT:
+                    HOST_REQUEST_TIMES.clear()
+                times = HOST_REQUEST_TIMES[host] = deque()
+            while times and now - times[0] >= 1.0:
+                times.popleft()
+            if len(times) < HOST_RATE_LIMIT:
+                times.append(now)
+                return
+            delay = 1.0 - (now - times[0])
+        time.sleep(delay)
+
+def parse_html(markup, parse_only=None):
+    """Parse HTML with the fastest available BeautifulSoup tree builder"""
+    try:
+        return BeautifulSoup(markup, HTML_PARSER, parse_only=parse_only)
+    except FeatureNotFound:
+        return BeautifulSoup(markup, 'html.parser', parse_only=parse_only)
+
+def read_capped(response, max_bytes):
+    """Read a streamed response body, stopping once max_bytes have been received"""
+    chunks = []
+    size = 0
+    try:
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                break
+    finally:
+        response.close()
+    return b''.join(chunks)[:max_bytes]
+
+def decode_body(body, encoding):
+    """Decode raw response bytes the way requests' response.text would"""
+    try:
+        return body.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+def content_length_exceeds(response, limit):
+    """True if the response declares a body larger than limit bytes"""
+    try:
+        return int(response.headers.get('Content-Length', 0)) > limit
+    except ValueError:
+        return False
+
+def fetch_page(page_url):
+    """
+    Download a page for the crawl
+    Returns (response, html_bytes); html_bytes is None for failed, non-HTML or oversized responses
+    """
+    wait_for_host_slot(page_url)
+    response = HTTP_SESSION.get(page_url, timeout=PAGE_FETCH_TIMEOUT, stream=True)
+    if (response.status_code != 200
+            or 'text/html' not in response.headers.get('Content-Type', '')
+            or content_length_exceeds(response, MAX_PAGE_CONTENT_LENGTH)):
+        response.close()
+        return response, None
+    return response, read_capped(response, MAX_PAGE_BYTES)
+
+def normalize_url(u):
+    """Normalize a URL for dedupe (no scheme, no www, no trailing slash, no query or fragment)"""
+    u = u.strip().lower()
+    # Remove fragment and query
+    u = u.split('#')[0].split('?')[0]
+    # Remove scheme
+    if '://' in u:
+        u = u.split('://', 1)[1]
+    # Remove www prefix
+    if u.startswith('www.'):
+        u = u[4:]
+    # Remove trailing slash
+    if u.endswith('/'):
+        u = u[:-1]
+    return u
 
 def scrape_brand_from_url(url):
     """
     Scrape brand information from website
     Analyzes first 5 pages for comprehensive brand profile
+    Results are cached per normalized URL for SCRAPE_CACHE_TTL seconds, so
+    "acme.com", "https://www.acme.com/" etc. share one entry
     """
+    cache_key = normalize_url(url)
+    cached = SCRAPE_CACHE.get(cache_key)
+    if cached is not None:
+        print(f"Using cached scrape for {url}")
+        return cached
+    
+    brand_data = crawl_brand_from_url(url)
+    # Per-page errors are swallowed by the crawl, so a transient homepage failure comes
+    # back as an empty profile - only cache crawls that actually analyzed a page
+    if not brand_data['pages_analyzed']:
+        return brand_data
+    SCRAPE_CACHE.set(cache_key, brand_data)
+    return brand_data
+
+def crawl_brand_from_url(url):
+    """Crawl the website and build the brand profile (uncached)"""
     try:
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
@@ -31,26 +284,25 @@ def scrape_brand_from_url(url):
         visited_urls = set()
         pages_content = []
         
-        # Helper to get normalized URL (no scheme, no www, no trailing slash, no fragments)
-        def normalize_url(u):
-            u = u.strip().lower()
-            # Remove fragment and query
-            u = u.split('#')[0].split('?')[0]
-            # Remove scheme
-            if '://' in u:
-                u = u.split('://', 1)[1]
-            # Remove www prefix
-            if u.startswith('www.'):
-                u = u[4:]
-            # Remove trailing slash
-            if u.endswith('/'):
-                u = u[:-1]
-            return u
-            
         base_domain = url.split('//')[-1].split('/')[0].replace('www.', '')
         
         content_buffer = []
         
+        # Stylesheets are downloaded in the background as soon as a page links them,
+        # so they are mostly ready by the time colors/fonts are extracted
+        css_futures = {}
+        
+        # Images are collected from each page's full parse during the crawl, so no
+        # page HTML has to be kept around for a second pass.
+        # We separate "Content Images" (for posts) from "Logos" (branding)
+        content_images = []
+        seen_image_urls = set()
+        possible_logos = []
+        
+        # Follow-up pages are all known once the homepage is processed, so they are
+        # downloaded concurrently and consumed here in score order
+        page_futures = {}
+        
         # Crawl until we have analyzed 5 pages (limit reduced from 10)
         while pages_to_crawl and len(pages_content) < 5:
             current_url = pages_to_crawl.pop(0)
@@ -63,10 +315,8 @@ def scrape_brand_from_url(url):
             
             try:
                 print(f"Scraping page: {current_url}")
-                # Add delay to avoid blocking
-                response = requests.get(current_url, timeout=4, headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                })
+                page_future = page_futures.pop(current_url, None)
+                response, html_bytes = page_future.result() if page_future else fetch_page(current_url)
                 
                 # Mark as visited irrelevant of status to avoid retrying bad URLs
                 visited_urls.add(normalized_current)
@@ -75,11 +325,30 @@ def scrape_brand_from_url(url):
                 if response.url:
                     visited_urls.add(normalize_url(response.url))
                 
-                if response.status_code != 200 or 'text/html' not in response.headers.get('Content-Type', ''):
-                    print(f"Skipping non-HTML or failed URL: {current_url} (Status: {response.status_code})")
+                if html_bytes is None:
+                    print(f"Skipping non-HTML, oversized or failed URL: {current_url} (Status: {response.status_code})")
                     continue
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = parse_html(html_bytes)
+                
+                # Resolve stylesheet links from this parse so the color/font
+                # extractors don't have to re-parse the page HTML
+                # (an empty href would resolve to the page itself and re-download its HTML)
+                css_urls = [urljoin(current_url, link['href']) for link in soup.select('link[rel~="stylesheet" i][href]')
+                            if link['href'].strip()]
+                for css_url in css_urls:
+                    if css_url not in css_futures:
+                        css_futures[css_url] = CSS_FETCH_EXECUTOR.submit(fetch_css_text, css_url, timeout=CSS_FETCH_TIMEOUT)
+                
+                # Images first - the header/nav logo is removed by the cleanup below
+                try:
+                    collect_page_images(soup, current_url, content_images, seen_image_urls, possible_logos)
+                except Exception as e:
+                    print(f"Failed to extract images from {current_url}: {e}")
+                
+                # Colors/fonts used in the markup (inline styles, <style> blocks), scanned
+                # now so only the tokens are kept rather than the page HTML
+                hex_colors, font_families = scan_style_tokens(decode_body(html_bytes, response.encoding or soup.original_encoding))
                 
                 # cleanup
                 for tag in soup(["script", "style", "nav", "footer"]):
@@ -88,7 +357,7 @@ def scrape_brand_from_url(url):
                 # Extract main content more intelligently
                 # Prioritize main content areas (main, article, section) over all text
                 main_content = ""
-                main_sections = soup.find_all(['main', 'article', 'section', 'div'], class_=re.compile(r'content|main|body|post', re.I))
+                main_sections = soup.find_all(['main', 'article', 'section', 'div'], class_=MAIN_SECTION_CLASS_RE)
                 
                 if main_sections:
                     # Extract from main content areas first
@@ -103,16 +372,29 @@ def scrape_brand_from_url(url):
                     main_content = page_text
                 
                 # Extract key paragraphs (longer ones are usually more meaningful)
-                paragraphs = [p.get_text(strip=True) for p in soup.find_all('p') if len(p.get_text(strip=True)) > 100]
+                # and the short display paragraphs in one pass, reading each <p>'s text once.
+                # Repeated paragraphs (carousels, duplicated CTAs) are dropped; stop once both lists are full
+                unique_paragraphs = {}
+                display_paragraphs = []
+                for p in soup.find_all('p'):
+                    text = p.get_text(strip=True)
+                    if len(text) > 50 and len(display_paragraphs) < 5:
+                        display_paragraphs.append(text)
+                    if len(text) > 100:
+                        unique_paragraphs.setdefault(text, None)
+                    if len(unique_paragraphs) >= 10 and len(display_paragraphs) >= 5:
+                        break
+                paragraphs = list(unique_paragraphs)
                 if paragraphs:
                     # Add top paragraphs to ensure we get key content
-                    key_paragraphs = "\n\n".join(paragraphs[:10])  # Top 10 paragraphs
+                    key_paragraphs = "\n\n".join(paragraphs)  # Top 10 paragraphs
                     if key_paragraphs not in main_content:
                         main_content = key_paragraphs + "\n\n" + main_content
                 
                 # Increase per-page limit to 8000 chars to capture more content
                 page_content = main_content[:8000] if len(main_content) > 8000 else main_content
-                content_buffer.append(f"--- SOURCE: {current_url} ---\n{page_content}")
+                source_block = f"--- SOURCE: {current_url} ---\n{page_content}"
+                content_buffer.append(source_block)
                 
                 print(f"Extracted {len(page_content)} characters from {current_url}")
                 
@@ -120,8 +402,11 @@ def scrape_brand_from_url(url):
                 page_data = {
                     'url': current_url,
                     'title': soup.title.string.strip() if soup.title else 'No Title',
-                    'html_content': response.text, # Keep for color/font extraction
-                    'paragraphs': [p.get_text(strip=True) for p in soup.find_all('p') if len(p.get_text(strip=True)) > 50][:5]
+                    'hex_colors': hex_colors, # For color/font extraction
+                    'font_families': font_families,
+                    'css_urls': css_urls,
+                    'content_chars': len(source_block), # For the scraping summary log
+                    'paragraphs': display_paragraphs
                 }
                 
                 pages_content.append(page_data)
@@ -130,14 +415,11 @@ def scrape_brand_from_url(url):
                 # Only look for further pages if we are on the homepage (the start)
                 # This ensures we only crawl the "Main" pages linked from home, not deep links
                 if len(pages_content) == 1:
-                    candidates = []
+                    # Best-scoring link per normalized URL, deduped while scoring
+                    candidates = {}
                     
-                    # 1. Identify "Nav" links for scoring
-                    nav_links = []
-                    nav_areas = soup.find_all(['nav', 'header'])
-                    for area in nav_areas:
-                        for link in area.find_all('a', href=True):
-                             nav_links.append(link['href'])
+                    # 1. Identify "Nav" links for scoring (one selector walk over nav/header)
+                    nav_links = [link['href'] for link in soup.select('nav a[href], header a[href]')]
 
                     for link in soup.find_all('a', href=True):
                         href = link['href']
@@ -147,7 +429,7 @@ def scrape_brand_from_url(url):
                         # Domain check
                         link_domain = full_url.split('//')[-1].split('/')[0].replace('www.', '')
                         
-                        if link_domain == base_domain:
+                        if link_domain == base_domain and not has_extension(full_url, NON_HTML_EXTENSIONS):
                             if norm_link not in visited_urls and full_url != current_url:
                                 
                                 # Scoring System
@@ -160,7 +442,7 @@ def scrape_brand_from_url(url):
                                     score += 20
                                 
                                 # Priority 2: Keyword match
-                                if any(x in lower_url for x in ['about', 'contact', 'services', 'portfolio', 'work', 'blog', 'pricing', 'team']):
+                                if any(x in lower_url for x in PRIORITY_PAGE_KEYWORDS):
                                     score += 15
                                 
                                 # Priority 3: Short URL Depth (Prefer top-level pages like /about)
@@ -168,26 +450,23 @@ def scrape_brand_from_url(url):
                                 depth = len(full_url.rstrip('/').split('/')) 
                                 score -= (depth * 2) # Penalize depth
                                 
-                                candidates.append({
-                                    'url': full_url,
-                                    'score': score
-                                })
+                                # Keep the first link among equal scores (document order)
+                                best = candidates.get(norm_link)
+                                if best is None or score > best['score']:
+                                    candidates[norm_link] = {
+                                        'url': full_url,
+                                        'score': score,
+                                        'order': len(candidates) if best is None else best['order']
+                                    }
 
-                    # Sort by score desc
-                    candidates.sort(key=lambda x: x['score'], reverse=True)
-                    
-                    # Take top 4 unique, valid links to reach total 5 pages
-                    seen_candidates = set()
-                    for c in candidates:
-                         u = c['url']
-                         norm = normalize_url(u)
-                         if norm not in seen_candidates and norm not in visited_urls:
-                             pages_to_crawl.append(u)
-                             seen_candidates.add(norm)
-                             if len(pages_to_crawl) >= 4:
-                                 break
+                    # Take top 4 unique links by score to reach total 5 pages;
+                    # ties go to the link that appears first on the page
+                    top_candidates = heapq.nlargest(4, candidates.values(), key=lambda c: (c['score'], -c['order']))
+                    pages_to_crawl.extend(c['url'] for c in top_candidates)
                     
                     print(f"Selected top pages to crawl: {pages_to_crawl}")
+                    for page_url in pages_to_crawl:
+                        page_futures[page_url] = PAGE_FETCH_EXECUTOR.submit(fetch_page, page_url)
             except Exception as e:
                 print(f"Failed to crawl {current_url}: {e}")
                 continue
@@ -207,133 +486,24 @@ def scrape_brand_from_url(url):
         print(f"Total pages scraped: {len(pages_content)}")
         print(f"Total content extracted: {total_chars} characters")
         for i, page in enumerate(pages_content, 1):
-            matching_buffers = [b for b in content_buffer if page['url'] in b]
-            page_chars = len(matching_buffers[0]) if matching_buffers else 0
-            print(f"  Page {i}: {page['url']} - {page_chars} chars - Title: {page.get('title', 'N/A')[:50]}")
+            print(f"  Page {i}: {page['url']} - {page['content_chars']} chars - Title: {page.get('title', 'N/A')[:50]}")
         print(f"========================\n")
         
-        # Extract assets (colors/fonts) from all gathered HTML
-        brand_data['colors'] = extract_colors_from_pages(pages_content)
-        brand_data['fonts'] = extract_fonts_from_pages(pages_content)
-        
         # Generate the massive summary using the aggregated text
         full_text = brand_data['content_summary_source']
         if len(full_text) < 500: # fallback if crawl failed to get text
              full_text = " ".join([p for page in pages_content for p in page['paragraphs']])
-             
-        brand_data['content_summary'] = generate_brand_summary(full_text, fallback_text=brand_data.get('description'))
         
-        # New: Extract Images
-        # We separate "Content Images" (for posts) from "Logos" (branding)
-        content_images = []
-        possible_logos = []
-        
-        # Common junk keywords in filenames or classes
-        junk_image_keywords = ['facebook', 'twitter', 'linkedin', 'instagram', 'pixel', 'analytics', 
-                               'icon', 'button', 'user', 'cart', 'search', 'arrow', 'flag', 'placeholder', 
-                               'avatar', 'download', 'spinner', 'loading',
-                               # "Marquee" junk - client logos, awards, etc.
-                               'client', 'partner', 'sponsor', 'award', 'badge', 'testimonial', 'review']
+        # Start the AI calls now so they run while CSS is processed:
+        # the summary, plus tagline/description metadata when the crawl didn't find them
+        summary_future = BACKGROUND_EXECUTOR.submit(generate_brand_summary, full_text, fallback_text=brand_data.get('description'))
+        metadata_future = None
+        if not brand_data.get('tagline') or not brand_data.get('description') or len(brand_data.get('description', '')) < 50:
+            metadata_future = BACKGROUND_EXECUTOR.submit(generate_brand_metadata, full_text)
         
-        for page in pages_content:
-             try:
-                 soup = BeautifulSoup(page.get('html_content', ''), 'html.parser')
-                 # Find all img tags (not just those with src)
-                 for img in soup.find_all('img'):
-                     # Handle lazy loading: check data-src, data-lazy-src, data-original, then src
-                     src = (img.get('data-src') or 
-                           img.get('data-lazy-src') or 
-                           img.get('data-original') or 
-                           img.get('src') or 
-                           img.get('data-srcset') or
-                           '')
-                     
-                     # Handle srcset (take first URL if present)
-                     if not src and img.get('srcset'):
-                         srcset = img.get('srcset')
-                         # Extract first URL from srcset (format: "url size, url2 size2")
-                         if srcset:
-                             src = srcset.split(',')[0].strip().split()[0]
-                     
-                     if not src or src.startswith('data:'):
-                         continue
-                         
-                     full_src = urljoin(page['url'], src)
-                     lower_src = full_src.lower()
-                     
-                     # Get alt text and surrounding context for better relevance scoring
-                     alt_text = img.get('alt', '').lower()
-                     img_class = ' '.join(img.get('class', [])).lower()
-                     
-                     # 1. Logo Detection (Keep this separate)
-                     # We want logos for the profile header
-                     if any(x in lower_src for x in ['logo', 'brand-mark']) or 'logo' in alt_text:
-                         if full_src not in possible_logos:
-                             possible_logos.append(full_src)
-                         # Don't add obvious logos to "Content Images" unless we are desperate
-                         continue
-
-                     # 2. Filter Junk for Content Images
-                     # Check dimensions if available
-                     width = img.get('width')
-                     height = img.get('height')
-                     if width and width.isdigit() and int(width) < 100: continue
-                     if height and height.isdigit() and int(height) < 100: continue
-
-                     # Enhanced keyword filtering (check alt text and class too)
-                     combined_text = f"{lower_src} {alt_text} {img_class}"
-                     if any(x in combined_text for x in junk_image_keywords):
-                         continue
-                     
-                     # 3. Score/Prioritize Content Images
-                     # We prefer JPG/WEBP (photos) over PNG/SVG (graphics) for content
-                     score = 0
-                     if any(ext in lower_src for ext in ['.jpg', '.jpeg', '.webp']):
-                         score += 10
-                     if any(keyword in lower_src for keyword in ['hero', 'banner', 'main', 'feature', 'cover', 'background']):
-                         score += 20
-                     # Boost score if alt text suggests relevance
-                     if alt_text and len(alt_text) > 10:
-                         score += 5
-                     # Boost for larger images (likely more important)
-                     if width and width.isdigit() and int(width) > 400:
-                         score += 5
-                     if height and height.isdigit() and int(height) > 400:
-                         score += 5
-                     
-                     if full_src not in [c['url'] for c in content_images]:
-                         content_images.append({'url': full_src, 'score': score, 'alt': alt_text})
-                 
-                 # Also extract background images from CSS (common in modern sites)
-                 # Look for elements with inline style background-image
-                 for elem in soup.find_all(style=True):
-                     style = elem.get('style', '')
-                     # Match url(...) patterns in background-image
-                     bg_matches = re.findall(r'background-image:\s*url\(["\']?([^"\'()]+)["\']?\)', style, re.IGNORECASE)
-                     for bg_url in bg_matches:
-                         if bg_url.startswith('data:'):
-                             continue
-                         full_bg_src = urljoin(page['url'], bg_url)
-                         lower_bg_src = full_bg_src.lower()
-                         
-                         # Skip logos and junk
-                         if any(x in lower_bg_src for x in ['logo', 'brand-mark']):
-                             continue
-                         if any(x in lower_bg_src for x in junk_image_keywords):
-                             continue
-                         
-                         # Score background images (slightly lower priority than img tags)
-                         bg_score = 5  # Base score for background images
-                         if any(ext in lower_bg_src for ext in ['.jpg', '.jpeg', '.webp']):
-                             bg_score += 10
-                         if any(keyword in lower_bg_src for keyword in ['hero', 'banner', 'main', 'feature', 'cover']):
-                             bg_score += 15
-                         
-                         if full_bg_src not in [c['url'] for c in content_images]:
-                             content_images.append({'url': full_bg_src, 'score': bg_score, 'alt': ''})
-                         
-             except Exception:
-                 continue
+        # Extract assets (colors/fonts) from the crawled pages' tokens and stylesheets -
+        # the stylesheet downloads are network-bound, so run them in the background
+        styles_future = BACKGROUND_EXECUTOR.submit(extract_styles_from_pages, pages_content, css_futures)
         
         # Sort content images by score (higher scores first)
         content_images.sort(key=lambda x: x['score'], reverse=True)
@@ -341,14 +511,16 @@ def scrape_brand_from_url(url):
         # Retrieve all images (no limit) - sorted by relevance score
         brand_data['images'] = [c['url'] for c in content_images]
         
+        brand_data['colors'], brand_data['fonts'] = styles_future.result()
+        brand_data['content_summary'] = summary_future.result()
+        
         # Use found logo if available and we don't have one
         if not brand_data.get('logo_url') and possible_logos:
             brand_data['logo_url'] = possible_logos[0]
 
         # NEW: Ensure tagline and description are filled if missing
-        if not brand_data.get('tagline') or not brand_data.get('description') or len(brand_data.get('description', '')) < 50:
-            from app.content_generator import generate_brand_metadata
-            metadata = generate_brand_metadata(full_text)
+        if metadata_future:
+            metadata = metadata_future.result()
             if not brand_data.get('tagline'):
                 brand_data['tagline'] = metadata.get('tagline', '')
             if not brand_data.get('description') or len(brand_data.get('description')) < 50:
@@ -359,56 +531,198 @@ def scrape_brand_from_url(url):
     except Exception as e:
         raise Exception(f"Failed to scrape brand from URL: {str(e)}")
 
-def extract_colors_from_pages(pages_content):
-    """Extract dominant colors from page content and linked CSS"""
-    all_content = []
-    
-    # 1. Add HTML content
-    for page in pages_content:
-        all_content.append(page.get('html_content', ''))
+def collect_page_images(soup, page_url, content_images, seen_image_urls, possible_logos):
+    """
+    Collect scored content images and logo candidates from a parsed page
+    Appends to content_images / possible_logos; seen_image_urls dedupes content images across pages
+    """
+    # Find all img tags (not just those with src)
+    for img in soup.find_all('img'):
+        # Handle lazy loading: check data-src, data-lazy-src, data-original, then src
+        src = (img.get('data-src') or 
+              img.get('data-lazy-src') or 
+              img.get('data-original') or 
+              img.get('src') or 
+              img.get('data-srcset') or
+              '')
         
-        # 2. Find and fetch CSS files
-        try:
-            soup = BeautifulSoup(page.get('html_content', ''), 'html.parser')
-            for link in soup.find_all('link', rel='stylesheet'):
-                css_url = link.get('href')
-                if css_url:
-                    full_css_url = urljoin(page['url'], css_url)
-                    try:
-                        # Fetch CSS with a timeout
-                        css_response = requests.get(full_css_url, timeout=2)
-                        if css_response.status_code == 200:
-                            all_content.append(css_response.text)
-                    except:
-                        continue
-        except Exception:
+        # Handle srcset (take first URL if present)
+        if not src and img.get('srcset'):
+            srcset = img.get('srcset')
+            # Extract first URL from srcset (format: "url size, url2 size2")
+            if srcset:
+                src = srcset.split(',')[0].strip().split()[0]
+        
+        if not src or src.startswith('data:'):
             continue
             
-    # Combine all content
-    full_text = " ".join(all_content)
+        full_src = urljoin(page_url, src)
+        lower_src = full_src.lower()
+        
+        # Get alt text and surrounding context for better relevance scoring
+        alt_text = img.get('alt', '').lower()
+        img_class = ' '.join(img.get('class', [])).lower()
+        
+        # 1. Logo Detection (Keep this separate)
+        # We want logos for the profile header
+        if LOGO_HINT_RE.search(lower_src) or 'logo' in alt_text:
+            if full_src not in possible_logos:
+                possible_logos.append(full_src)
+            # Don't add obvious logos to "Content Images" unless we are desperate
+            continue
+
+        # 2. Filter Junk for Content Images
+        # Check dimensions if available
+        width = img.get('width')
+        height = img.get('height')
+        if width and width.isdigit() and int(width) < 100: continue
+        if height and height.isdigit() and int(height) < 100: continue
+
+        # Enhanced keyword filtering (check alt text and class too)
+        combined_text = f"{lower_src} {alt_text} {img_class}"
+        if JUNK_IMAGE_RE.search(combined_text):
+            continue
+        
+        # 3. Score/Prioritize Content Images
+        # We prefer JPG/WEBP (photos) over PNG/SVG (graphics) for content
+        score = 0
+        if any(ext in lower_src for ext in PHOTO_EXTENSIONS):
+            score += 10
+        if HERO_IMAGE_RE.search(lower_src):
+            score += 20
+        # Boost score if alt text suggests relevance
+        if alt_text and len(alt_text) > 10:
+            score += 5
+        # Boost for larger images (likely more important)
+        if width and width.isdigit() and int(width) > 400:
+            score += 5
+        if height and height.isdigit() and int(height) > 400:
+            score += 5
+        
+        if full_src not in seen_image_urls:
+            seen_image_urls.add(full_src)
+            content_images.append({'url': full_src, 'score': score, 'alt': alt_text})
     
-    # Hex color pattern - expanded to capture 3-digit hex too
-    hex_pattern = r'#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})\b'
-    matches = re.findall(hex_pattern, full_text)
+    # Also extract background images from CSS (common in modern sites)
+    # Look for elements with inline style background-image
+    for elem in soup.find_all(style=True):
+        style = elem.get('style', '')
+        # Match url(...) patterns in background-image
+        bg_matches = BACKGROUND_IMAGE_RE.findall(style)
+        for bg_url in bg_matches:
+            if bg_url.startswith('data:'):
+                continue
+            full_bg_src = urljoin(page_url, bg_url)
+            lower_bg_src = full_bg_src.lower()
+            
+            # Skip logos and junk
+            if LOGO_HINT_RE.search(lower_bg_src):
+                continue
+            if JUNK_IMAGE_RE.search(lower_bg_src):
+                continue
+            
+            # Score background images (slightly lower priority than img tags)
+            bg_score = 5  # Base score for background images
+            if any(ext in lower_bg_src for ext in PHOTO_EXTENSIONS):
+                bg_score += 10
+            if HERO_BACKGROUND_RE.search(lower_bg_src):
+                bg_score += 15
+            
+            if full_bg_src not in seen_image_urls:
+                seen_image_urls.add(full_bg_src)
+                content_images.append({'url': full_bg_src, 'score': bg_score, 'alt': ''})
+
+def has_extension(target_url, extensions):
+    """True if the URL's path (ignoring query and fragment) ends in one of the given extensions"""
+    return posixpath.splitext(urlparse(target_url).path)[1].lower() in extensions
+
+def fetch_css_text(css_url, timeout):
+    """Fetch a stylesheet, skipping URLs already known to contain no colors or fonts"""
+    if EMPTY_CSS_CACHE.get(css_url):
+        return ''
+
+    try:
+        wait_for_host_slot(css_url)
+        css_response = HTTP_SESSION.get(css_url, timeout=timeout, stream=True)
+        if css_response.status_code != 200 or content_length_exceeds(css_response, MAX_CSS_CONTENT_LENGTH):
+            css_response.close()
+            return ''
+        css_text = decode_body(read_capped(css_response, MAX_CSS_BYTES), css_response.encoding)
+    except Exception:
+        return ''
+    if not HEX_COLOR_RE.search(css_text) and not FONT_FAMILY_RE.search(css_text):
+        EMPTY_CSS_CACHE.set(css_url, True)
+        return ''
+
+    return css_text
+
+def scan_style_tokens(text):
+    """
+    Scan page HTML or a stylesheet for color and font tokens
+    Returns (hex_colors, font_families)
+
+    Colors after an unterminated inline font-family must still be found:
+    >>> scan_style_tokens('<p style="font-family: Arial">Hi</p><div style="background:#FF0000;color:#00ff00">')[0]
+    ['FF0000', '00ff00']
+    """
+    return HEX_COLOR_RE.findall(text), FONT_FAMILY_RE.findall(text)
+
+def extract_styles_from_pages(pages_content, css_futures=None):
+    """
+    Extract dominant colors and font families from page content and linked CSS
+    Each stylesheet is fetched once and scanned once per token type
+    css_futures optionally maps CSS URLs to fetches already started during the crawl
+    Returns (colors, fonts)
+    """
+    # Site-wide stylesheets are linked from every page, so dedupe first: each
+    # unique URL is downloaded once and its tokens are counted once
+    css_urls = list(dict.fromkeys(css_url for page in pages_content for css_url in page.get('css_urls', [])))
+    css_futures = dict(css_futures or {})
     
-    # Normalize to uppercase and 6-digit
-    normalized_colors = []
-    for c in matches:
-        c = c.upper()
-        if len(c) == 3:
-            c = "".join([x*2 for x in c])
-        normalized_colors.append(f"#{c}")
+    # Fetch any linked CSS files not already in flight concurrently - the
+    # downloads are pure network wait, so overlap them instead of paying each RTT in turn
+    for css_url in css_urls:
+        if css_url not in css_futures:
+            css_futures[css_url] = CSS_FETCH_EXECUTOR.submit(fetch_css_text, css_url, timeout=CSS_FETCH_TIMEOUT)
+    css_by_url = {css_url: css_futures[css_url].result() for css_url in css_urls}
     
-    # Filter common "boring" colors if we have enough variety
-    boring_colors = {'#FFFFFF', '#000000', '#F2F2F2', '#CCCCCC', '#333333'}
+    hex_matches = []
+    font_matches = []
+    seen_css = set()
+    for page in pages_content:
+        # 1. Add tokens from the page HTML (scanned during the crawl)
+        hex_matches.extend(page.get('hex_colors', []))
+        font_matches.extend(page.get('font_families', []))
+        
+        # 2. Add CSS this page introduced, keeping stylesheet order
+        for css_url in page.get('css_urls', []):
+            if css_url in seen_css:
+                continue
+            seen_css.add(css_url)
+            css_text = css_by_url[css_url]
+            if css_text:
+                css_hex, css_fonts = scan_style_tokens(css_text)
+                hex_matches.extend(css_hex)
+                font_matches.extend(css_fonts)
     
-    color_counts = Counter(normalized_colors)
+    return rank_colors(hex_matches), rank_fonts(font_matches)
+
+def rank_colors(matches):
+    """Pick the dominant colors from raw hex matches"""
+    # Count raw tokens first, then normalize each distinct token once
+    # (uppercase, 6-digit) - pages repeat the same few colors many times
+    color_counts = Counter()
+    for c, count in Counter(matches).items():
+        c = c.upper()
+        if len(c) == 3:
+            c = c[0]*2 + c[1]*2 + c[2]*2
+        color_counts[f"#{c}"] += count
     
     # Remove boring colors only if we have other options
-    filtered_counts = {k: v for k, v in color_counts.items() if k not in boring_colors}
+    filtered_counts = {k: v for k, v in color_counts.items() if k not in BORING_COLORS}
     
     if len(filtered_counts) >= 3:
-        top_colors = Counter(filtered_counts).most_common(5)
+        top_colors = heapq.nlargest(5, filtered_counts.items(), key=lambda item: item[1])
     else:
         top_colors = color_counts.most_common(5)
     
@@ -421,45 +735,15 @@ def extract_colors_from_pages(pages_content):
         
     return results
 
-def extract_fonts_from_pages(pages_content):
-    """Extract font families from pages and CSS"""
-    # Note: We re-fetch CSS here or rely on the fact that we should have stored it? 
-    # For efficiency we might want to do it once, but for now copying logic is safer than refactoring the whole flow.
-    # In a real app, we'd cache the CSS.
-    
-    all_content = []
-    for page in pages_content:
-        all_content.append(page.get('html_content', ''))
-        
-        # Basic CSS fetch (light version of above)
-        try:
-            soup = BeautifulSoup(page.get('html_content', ''), 'html.parser')
-            for link in soup.find_all('link', rel='stylesheet'):
-                css_url = link.get('href')
-                if css_url:
-                    full_css_url = urljoin(page['url'], css_url)
-                    try:
-                        css_response = requests.get(full_css_url, timeout=1)
-                        if css_response.status_code == 200:
-                            all_content.append(css_response.text)
-                    except:
-                        pass
-        except:
-            pass
-            
-    full_text = " ".join(all_content)
-    
-    # Font family pattern - improved to capture multi-word fonts
-    font_pattern = r'font-family:\s*([^;}]+)'
-    matches = re.findall(font_pattern, full_text)
-    
+def rank_fonts(matches):
+    """Pick the most used font families from raw font-family declarations"""
     cleaned_fonts = []
     for font_str in matches:
-        # Split by comma to get the primary font
-        fonts = [f.strip().strip('"\'') for f in font_str.split(',')]
-        for f in fonts:
-            # Filter generic keywords and invalid junk
-            if f.lower() not in ['sans-serif', 'serif', 'monospace', 'inherit', 'initial'] and len(f) > 2:
+        # Split by comma to get the primary font, stripping lazily since we stop at the first valid one
+        for f in font_str.split(','):
+            f = f.strip().strip('"\'')
+            # Filter invalid junk (cheap length check first) and generic keywords
+            if len(f) > 2 and f.lower() not in GENERIC_FONTS:
                 cleaned_fonts.append(f)
                 break # Just take the first valid one from the stack
             
@@ -1,9 +1,13 @@
 import openai
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import json
 import os
 import random
+import re
+import threading
+from urllib.parse import quote
 
 # TODO: Add your Gemini API key here
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
@@ -13,6 +17,86 @@ GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 POLLINATION_API_KEY = os.getenv('POLLINATION_API_KEY', '')
 USE_POLLINATION = True  # Set to False to disable AI image generation
 
+# Calendar card colors, cycled across posts for visual variety
+POST_COLORS = ['pink', 'green', 'yellow', 'purple', 'blue']
+
+# Platform-specific formats for fallback posts
+PLATFORM_POST_FORMATS = {
+    'instagram': {
+        'titles': ['Behind the Scenes', 'Product Spotlight', 'Customer Story', 'Team Feature', 'Tips & Tricks'],
+        'hashtags': True,
+        'max_length': 2200
+    },
+    'linkedin': {
+        'titles': ['Industry Insights', 'Team Achievement', 'Thought Leadership', 'Company Update', 'Career Opportunities'],
+        'hashtags': False,
+        'max_length': 3000
+    },
+    'x': {
+        'titles': ['Quick Tip', 'Daily Inspiration', 'Hot Take', 'Question for You', 'Breaking News'],
+        'hashtags': True,
+        'max_length': 280
+    },
+    'facebook': {
+        'titles': ['Community Update', 'Event Announcement', 'Fan Feature', 'Weekly Roundup', 'Success Story'],
+        'hashtags': False,
+        'max_length': 5000
+    }
+}
+
+# Fallback caption openers per tone ({brand_name} is filled in per post)
+TONE_INTROS = {
+    'professional': "At {brand_name}, we believe in",
+    'casual': "Hey friends! {brand_name} here with",
+    'inspirational': "Dream big with {brand_name}.",
+    'educational': "Did you know? {brand_name} brings you",
+    'playful': "Guess what? {brand_name} has something fun!"
+}
+
+# Platform-specific aspect hints for generated images
+IMAGE_ASPECT_HINTS = {
+    'instagram': 'square format, 1:1 aspect ratio',
+    'linkedin': 'professional, landscape format',
+    'x': 'wide format, 16:9 aspect ratio',
+    'facebook': 'social media friendly'
+}
+
+# Max OpenAI post requests in flight at once while building a calendar
+POST_GENERATION_WORKERS = 5
+
+# Max brand summary characters embedded in each per-post prompt. Set above the AI
+# summary's own budget (400-500 words, max_tokens=800) so those are never clipped;
+# it only bounds an unusually long manually entered brand description.
+POST_PROMPT_SUMMARY_CHARS = 5000
+
+# Whitespace runs in scraped text: horizontal runs collapse to one space, blank-line
+# runs to a single paragraph break, so prompt character budgets go to actual content
+HORIZONTAL_SPACE_RE = re.compile(r'[^\S\n]+')
+BLANK_LINES_RE = re.compile(r'\n\s*\n')
+
+# OpenAI clients keyed by API key, created on first use and shared across calls
+# so the HTTP connection pool (and its TLS sessions) is reused between requests
+_OPENAI_CLIENTS = {}
+_OPENAI_CLIENTS_LOCK = threading.Lock()
+
+
+def compact_whitespace(text: str) -> str:
+    """Collapse redundant whitespace while keeping paragraph breaks"""
+    text = HORIZONTAL_SPACE_RE.sub(' ', text)
+    return BLANK_LINES_RE.sub('\n\n', text).strip()
+
+
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    """Return the shared OpenAI client for this API key, creating it lazily"""
+    client = _OPENAI_CLIENTS.get(api_key)
+    if client is None:
+        with _OPENAI_CLIENTS_LOCK:
+            client = _OPENAI_CLIENTS.get(api_key)
+            if client is None:
+                client = openai.OpenAI(api_key=api_key)
+                _OPENAI_CLIENTS[api_key] = client
+    return client
+
 
 def clean_brand_name(raw_name: str) -> str:
     """
@@ -73,9 +157,6 @@ def generate_posts_for_calendar(
         today = datetime.now()
         schedule_days = distribute_posts_across_week(num_posts)
         
-        # Color palette for visual variety
-        colors = ['pink', 'green', 'yellow', 'purple', 'blue']
-        
         # Generate content using Gemini (or fallback)
         if GEMINI_API_KEY:
             # TODO: Implement actual Gemini API call
@@ -85,9 +166,32 @@ def generate_posts_for_calendar(
         # Try to use OpenAI for high-quality text generation if available
         OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
         
+        post_platforms = [platforms[i % len(platforms)] if platforms else 'instagram' for i in range(num_posts)]
+        
+        # Request every post from OpenAI up front - each call is a multi-second
+        # round trip, so run them concurrently instead of one after another
+        openai_posts = [None] * num_posts
+        if OPENAI_API_KEY and num_posts > 0:
+            with ThreadPoolExecutor(max_workers=min(num_posts, POST_GENERATION_WORKERS)) as executor:
+                futures = [
+                    executor.submit(
+                        generate_text_with_openai,
+                        brand_name=brand_name,
+                        brand_summary=brand_summary,
+                        platform=platform,
+                        tone=tone
+                    )
+                    for platform in post_platforms
+                ]
+            for i, future in enumerate(futures):
+                try:
+                    openai_posts[i] = future.result()
+                except Exception as e:
+                    print(f"OpenAI generation failed: {e}")
+        
         # Fallback: Generate mock content for now (API to be added)
         for i in range(num_posts):
-            platform = platforms[i % len(platforms)] if platforms else 'instagram'
+            platform = post_platforms[i]
             
             # Schedule at a reasonable posting time (9am-12pm)
             post_hour = 9 + (i % 4)  # 9am, 10am, 11am, 12pm
@@ -99,19 +203,8 @@ def generate_posts_for_calendar(
             )
             
             # Generate content based on brand
-            post_content = None
-            
             # 1. Try OpenAI first
-            if OPENAI_API_KEY:
-                try:
-                    post_content = generate_text_with_openai(
-                        brand_name=brand_name,
-                        brand_summary=brand_summary,
-                        platform=platform,
-                        tone=tone
-                    )
-                except Exception as e:
-                    print(f"OpenAI generation failed: {e}")
+            post_content = openai_posts[i]
             
             # 2. Key available but failed, or no key -> Use fallback
             if not post_content:
@@ -142,7 +235,7 @@ def generate_posts_for_calendar(
                 'image_url': image_url,
                 'platform': platform,
                 'scheduled_date': schedule_date.isoformat(),
-                'color': colors[i % len(colors)]
+                'color': POST_COLORS[i % len(POST_COLORS)]
             })
         
         return posts
@@ -173,45 +266,13 @@ def generate_fallback_post_content(
 ) -> Dict[str, str]:
     """Generate fallback content when AI is unavailable."""
     
-    # Platform-specific formats
-    platform_formats = {
-        'instagram': {
-            'titles': ['Behind the Scenes', 'Product Spotlight', 'Customer Story', 'Team Feature', 'Tips & Tricks'],
-            'hashtags': True,
-            'max_length': 2200
-        },
-        'linkedin': {
-            'titles': ['Industry Insights', 'Team Achievement', 'Thought Leadership', 'Company Update', 'Career Opportunities'],
-            'hashtags': False,
-            'max_length': 3000
-        },
-        'x': {
-            'titles': ['Quick Tip', 'Daily Inspiration', 'Hot Take', 'Question for You', 'Breaking News'],
-            'hashtags': True,
-            'max_length': 280
-        },
-        'facebook': {
-            'titles': ['Community Update', 'Event Announcement', 'Fan Feature', 'Weekly Roundup', 'Success Story'],
-            'hashtags': False,
-            'max_length': 5000
-        }
-    }
-    
-    format_info = platform_formats.get(platform, platform_formats['instagram'])
+    format_info = PLATFORM_POST_FORMATS.get(platform, PLATFORM_POST_FORMATS['instagram'])
     titles = format_info['titles']
     
     title = titles[(post_number - 1) % len(titles)]
     
     # Generate caption based on tone
-    tone_intros = {
-        'professional': f"At {brand_name}, we believe in",
-        'casual': f"Hey friends! {brand_name} here with",
-        'inspirational': f"Dream big with {brand_name}.",
-        'educational': f"Did you know? {brand_name} brings you",
-        'playful': f"Guess what? {brand_name} has something fun!"
-    }
-    
-    intro = tone_intros.get(tone, tone_intros['professional'])
+    intro = TONE_INTROS.get(tone, TONE_INTROS['professional']).format(brand_name=brand_name)
     
     caption = f"{intro} excellence and innovation every day. {title.lower()} - this is what drives us forward. Stay tuned for more updates!"
     
@@ -233,7 +294,6 @@ def generate_minimal_fallback_posts(
     brand_name = brand_data.get('name', 'Your Brand')
     posts = []
     today = datetime.now()
-    colors = ['pink', 'green', 'yellow', 'purple', 'blue']
     
     for i in range(num_posts):
         platform = platforms[i % len(platforms)] if platforms else 'instagram'
@@ -244,7 +304,7 @@ def generate_minimal_fallback_posts(
             'image_url': None,
             'platform': platform,
             'scheduled_date': (today + timedelta(days=i)).isoformat(),
-            'color': colors[i % len(colors)]
+            'color': POST_COLORS[i % len(POST_COLORS)]
         })
     
     return posts
@@ -302,17 +362,7 @@ def generate_image_with_pollination(description: str, brand_name: str, platform:
         URL to the generated image
     """
     try:
-        from urllib.parse import quote
-        
-        # Platform-specific aspect hints
-        aspect_hints = {
-            'instagram': 'square format, 1:1 aspect ratio',
-            'linkedin': 'professional, landscape format',
-            'x': 'wide format, 16:9 aspect ratio',
-            'facebook': 'social media friendly'
-        }
-        
-        aspect = aspect_hints.get(platform, 'square format')
+        aspect = IMAGE_ASPECT_HINTS.get(platform, 'square format')
         
         # Create a descriptive prompt for the image
         prompt = f"Professional social media image for {brand_name}, {description}, modern clean aesthetic, {aspect}, high quality, vibrant colors, no text overlay"
@@ -356,7 +406,8 @@ def generate_text_with_openai(
     Prioritizes brand name and relevance.
     """
     try:
-        client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        client = get_openai_client(os.getenv('OPENAI_API_KEY'))
+        brand_summary = (brand_summary or '')[:POST_PROMPT_SUMMARY_CHARS]
         
         system_prompt = f"""You are a professional social media manager for the brand "{brand_name}".
 Your goal is to create highly relevant, engaging content based on the brand's summary: "{brand_summary}".
@@ -402,7 +453,7 @@ def generate_image_with_dalle(content_description: str, brand_name: str, style:
         if not api_key:
             return ""
         
-        client = openai.OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
         
         # Create a prompt for image generation based on content
         image_prompt = f"""
@@ -436,7 +487,7 @@ def generate_weekly_content(brand_data: Dict[str, Any], tone: str = 'professiona
         if not api_key:
             return generate_fallback_content(brand_data, tone)
             
-        client = openai.OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
         
         brand_name = brand_data.get('name', 'Brand')
         brand_desc = brand_data.get('description', '')
@@ -759,12 +810,12 @@ def generate_brand_summary(raw_text: str, fallback_text: str = None, tone: str =
                 return fallback_text
             return raw_text[:300] + "..." if len(raw_text) > 300 else raw_text
         
-        client = openai.OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
         
         # Increase limit significantly to include content from all pages
         # For 5 pages with ~8000 chars each = ~40000 chars max
         # Use up to 35000 chars to stay within token limits but capture all pages
-        content_for_summary = raw_text[:35000] if len(raw_text) > 35000 else raw_text
+        content_for_summary = compact_whitespace(raw_text)[:35000]
         
         # Log how much content we're using
         print(f"Generating summary from {len(content_for_summary)} characters (out of {len(raw_text)} total)")
@@ -830,13 +881,13 @@ def generate_brand_metadata(raw_text: str) -> Dict[str, str]:
         if not api_key:
             return {'tagline': '', 'description': ''}
             
-        client = openai.OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
         
         prompt = f"""
         Extract or generate a brand tagline and a brief description (1-2 sentences) for the following context.
         
         Context:
-        {raw_text[:4000]}
+        {compact_whitespace(raw_text)[:4000]}
         
         Return JSON only: {{"tagline": "...", "description": "..."}}
         """
@@ -1,8 +1,11 @@
 import uuid
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from flask import Blueprint, render_template, request, jsonify, session
 from app.brand_scraper import scrape_brand_from_url
 from app.brand_fetcher import fetch_brand_assets
-from app.content_generator import generate_weekly_content
+from app.content_generator import generate_weekly_content, generate_posts_for_calendar
 import json
 from datetime import datetime
 
@@ -32,19 +35,25 @@ def analyze_brand():
             if not url:
                 return jsonify({'error': 'URL is required'}), 400
             
-            # Scrape brand information from website
-            brand_data = scrape_brand_from_url(url)
-            
-            # Fetch additional assets from BrandFetch
-            # Safely extract brand name from URL (handle missing protocol)
+            # Derive the BrandFetch lookup from the domain up front so it doesn't
+            # have to wait for the scrape - /v2/brands/{domain} expects e.g. "acme.com"
+            # Safely extract the domain from URL (handle missing protocol)
             try:
-                from urllib.parse import urlparse
                 parsed = urlparse(url if url.startswith('http') else f'https://{url}')
-                domain = parsed.netloc or parsed.path.split('/')[0]
-                brand_name = brand_data.get('name') or domain.replace('www.', '').split('.')[0]
+                domain = (parsed.hostname or parsed.path.split('/')[0]).lower()
+                if domain.startswith('www.'):
+                    domain = domain[4:]
+                brand_domain = domain or 'brand'
             except:
-                brand_name = brand_data.get('name', 'brand')
-            brand_assets = fetch_brand_assets(brand_name)
+                brand_domain = 'brand'
+            
+            # Scrape brand information from website and fetch additional assets
+            # from BrandFetch concurrently - both are independent network calls
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                scrape_future = executor.submit(scrape_brand_from_url, url)
+                assets_future = executor.submit(fetch_brand_assets, brand_domain)
+                brand_data = scrape_future.result()
+                brand_assets = assets_future.result()
             
             # Smart merge: prioritize scraped data for colors/fonts, but allow BrandFetch logo
             if brand_assets.get('logo', {}).get('url'):
@@ -91,7 +100,6 @@ def analyze_brand():
         })
     
     except Exception as e:
-        import traceback
         print(f"Error in analyze_brand: {e}")
         traceback.print_exc()
         return jsonify({'error': str(e)}), 500
@@ -129,9 +137,6 @@ def generate_calendar():
         if not brand_data:
             return jsonify({'error': 'Brand data is required (session expired or invalid)'}), 400
         
-        # Import the content generator
-        from app.content_generator import generate_posts_for_calendar
-        
         # Generate posts using Gemini (or fallback)
         posts = generate_posts_for_calendar(
             brand_data=brand_data,
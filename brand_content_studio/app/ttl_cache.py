@@ -0,0 +1,43 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """
+    Thread-safe in-process cache whose entries expire after ttl seconds
+    Kept in least-recently-used order and capped at max_entries so memory stays
+    bounded on a long-running server.
+    Values are deep-copied on the way in and out: callers enrich the dicts they
+    get back, so the cached object itself is never handed out.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # {key: (stored_at, value)}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return a copy of the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+    def set(self, key, value):
+        """Store a copy of value, evicting the least recently used entries over the cap"""
+        entry = (time.time(), copy.deepcopy(value))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)